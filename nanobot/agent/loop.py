@@ -12,7 +12,6 @@ from typing import TYPE_CHECKING, Any, Awaitable, Callable
 from loguru import logger
 
 from nanobot.agent.context import ContextBuilder
-from nanobot.agent.memory import MemoryStore
 from nanobot.agent.subagent import SubagentManager
 from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
@@ -534,7 +533,7 @@ class AgentLoop:
                 message_tool.start_turn()
 
         if self.girlfriend_mode and self.remember_user_details:
-            captured = MemoryStore(self.workspace).capture_from_user_message(msg.content)
+            captured = self.context.memory.capture_from_user_message(msg.content)
             if captured:
                 logger.debug("Captured {} user fact(s) for memory", captured)
 
@@ -615,7 +614,7 @@ class AgentLoop:
 
     async def _consolidate_memory(self, session, archive_all: bool = False) -> bool:
         """Delegate to MemoryStore.consolidate(). Returns True on success."""
-        return await MemoryStore(self.workspace).consolidate(
+        return await self.context.memory.consolidate(
             session,
             self.provider,
             self.model,
@@ -2,21 +2,53 @@
 
 from __future__ import annotations
 
+import atexit
+import hashlib
+import io
 import json
+import os
 import re
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
 from nanobot.utils.helpers import ensure_dir
 
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 if TYPE_CHECKING:
     from nanobot.providers.base import LLMProvider
     from nanobot.session.manager import Session
 
 
+if ORJSON_AVAILABLE:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+
 _SAVE_MEMORY_TOOL = [
     {
         "type": "function",
@@ -43,6 +75,154 @@ _SAVE_MEMORY_TOOL = [
     }
 ]
 
+# Shared across calls; providers copy messages and tools before modifying them.
+_CONSOLIDATION_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a memory consolidation agent. Call the save_memory tool with your consolidation of the conversation.",
+}
+
+_CONSOLIDATION_PROMPT = """Process this conversation and call the save_memory tool with your consolidation.
+
+## Current Long-term Memory
+{memory}
+
+## Relationship Companion Mode
+{mode}
+
+When relationship mode is ON, prioritize retaining user preferences, emotional cues, and personal details
+that help maintain continuity in future conversations.
+
+## Conversation to Process
+{conversation}"""
+
+# Identical (memory, messages) inputs consolidated this recently are not sent to the LLM again.
+_CONSOLIDATION_CACHE_SIZE = 8
+_CONSOLIDATION_CACHE_TTL = 60.0
+
+_ROLE_LABELS = {"user": "USER", "assistant": "ASSISTANT", "system": "SYSTEM", "tool": "TOOL"}
+
+# (tag, pattern, output format) for personal facts picked up from user messages.
+_FACT_RULES: list[tuple[str, str, str]] = [
+    ("name", r"\bmy name is\s+([^.,!\n]{1,60})", "User's name is {0}."),
+    ("origin", r"\bi(?: am|'m)\s+from\s+([^.,!\n]{1,80})", "User is from {0}."),
+    ("prefer", r"\bi\s+prefer\s+([^.,!\n]{1,100})", "User prefers {0}."),
+    ("like", r"\bi\s+(?:really\s+)?like\s+([^.,!\n]{1,100})", "User likes {0}."),
+    ("love", r"\bi\s+(?:really\s+)?love\s+([^.,!\n]{1,100})", "User loves {0}."),
+    (
+        "favorite",
+        r"\bmy favorite\s+([^.,!\n]{1,40})\s+is\s+([^.,!\n]{1,80})",
+        "User's favorite {0} is {1}.",
+    ),
+    ("remember", r"\bremember that\s+([^\n]{3,180})", "{0}"),
+    ("forget", r"\bdon't forget(?: that)?\s+([^\n]{3,180})", "{0}"),
+]
+
+
+def _build_fact_regex(
+    rules: list[tuple[str, str, str]],
+) -> tuple[re.Pattern[str], dict[str, tuple[int, ...]], dict[str, str]]:
+    """Fuse the fact rules into one alternation so each message is scanned once.
+
+    Each alternative sits inside a lookahead, so matches are zero-width and one
+    rule's capture never swallows the trigger of another ("my name is Ada and
+    I'm from Oslo" yields both facts, as separate per-rule scans would). A rule
+    can then also match inside its own earlier capture; callers skip those
+    matches to keep per-rule scans non-overlapping.
+
+    Patterns are written in lowercase and matched against lowercased text, so no
+    IGNORECASE flag is needed.
+    """
+    compiled = re.compile("|".join(f"(?=(?P<{tag}>{body}))" for tag, body, _ in rules))
+    group_indices: dict[str, tuple[int, ...]] = {}
+    for tag, body, _ in rules:
+        start = compiled.groupindex[tag] + 1
+        group_indices[tag] = tuple(range(start, start + re.compile(body).groups))
+    return compiled, group_indices, {tag: fmt for tag, _, fmt in rules}
+
+
+_FACT_RE, _FACT_GROUPS, _FACT_FORMATS = _build_fact_regex(_FACT_RULES)
+# For the rare text whose lowercase form has a different length; same group layout.
+_FACT_RE_NOCASE = re.compile(_FACT_RE.pattern, re.IGNORECASE)
+_FACT_STRIP_CHARS = " \t\"'`"
+
+# Lowercase literals, at least one of which appears in any text a fact rule can match.
+# Broad words like "from" and "like" are needed for that guarantee, so most chatty
+# messages still pass; the prescreen mainly pays off for messages with no trigger
+# at all (commands, short replies, questions), not as a general speedup.
+_FACT_KEYWORDS: tuple[str, ...] = (
+    "my name is",
+    "from",
+    "prefer",
+    "like",
+    "love",
+    "my favorite",
+    "remember that",
+    "don't forget",
+)
+
+if AHOCORASICK_AVAILABLE:
+    _PREMATCHER = ahocorasick.Automaton()
+    for _keyword in _FACT_KEYWORDS:
+        _PREMATCHER.add_word(_keyword, _keyword)
+    _PREMATCHER.make_automaton()
+else:
+    _PREMATCHER = None
+
+
+# Leading triggers that save the rest of the line verbatim, mirroring the
+# "remember" and "forget" rules; longest first so "that" is not captured.
+_FACT_PREFIXES: tuple[tuple[str, str], ...] = (
+    ("remember that", "remember"),
+    ("don't forget that", "forget"),
+    ("don't forget", "forget"),
+)
+
+
+def _match_fact_prefix(low: str) -> tuple[str, int, int] | None:
+    """Return the rule tag and fact span after a leading verbatim-fact trigger, if any."""
+    start = len(low) - len(low.lstrip())
+    for prefix, tag in _FACT_PREFIXES:
+        if not low.startswith(prefix, start):
+            continue
+        body = start + len(prefix)
+        begin = len(low) - len(low[body:].lstrip())
+        if begin == body:
+            continue
+        line_end = low.find("\n", begin)
+        if line_end == -1:
+            line_end = len(low)
+        if line_end - begin < 3:
+            # Like the regex's \s+, give back spaces so the fact reaches 3 characters.
+            shorter = line_end - 3
+            if shorter <= body or "\n" in low[shorter:begin]:
+                continue
+            begin = shorter
+        return tag, begin, min(line_end, begin + 180)
+    return None
+
+
+def _has_fact_keyword(low: str) -> bool:
+    """Cheap literal prescreen so messages without any trigger skip the regex scan."""
+    if _PREMATCHER is not None:
+        return next(_PREMATCHER.iter(low), None) is not None
+    return any(keyword in low for keyword in _FACT_KEYWORDS)
+
+
+# Buffered history entries are written once they reach about one page.
+_HISTORY_WRITE_CHUNK = 4096
+
+# [epoch minute, formatted local "%Y-%m-%d %H:%M"] of the last stamp produced.
+_TS_CACHE: list = [-1, ""]
+
+
+def _now_minute_stamp() -> str:
+    """Current local time to the minute, reformatted only when the minute changes."""
+    now = int(time.time())
+    bucket = now // 60
+    if _TS_CACHE[0] != bucket:
+        _TS_CACHE[:] = [bucket, datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M")]
+    return _TS_CACHE[1]
+
 
 class MemoryStore:
     """Two-layer memory: MEMORY.md (long-term facts) + HISTORY.md (grep-searchable log)."""
@@ -51,22 +231,125 @@ class MemoryStore:
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
         self.history_file = self.memory_dir / "HISTORY.md"
+        # (file key, MEMORY.md text, formatted memory context); a None key means no file.
+        self._lt_cache: tuple[tuple[int, int, int] | None, str, str] | None = None
+        self._fact_fingerprints: set[str] | None = None
+        self._hist_fd: int | None = None
+        self._hist_buf = bytearray()
+        self._history_dirty = False
+        # Inputs of recent successful consolidations -> monotonic completion time.
+        self._recent_consolidations: OrderedDict[bytes, float] = OrderedDict()
+
+    @staticmethod
+    def _fingerprint(text: str) -> str:
+        norm = " ".join(text.split()).lower()
+        return hashlib.blake2b(norm.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _load_fingerprints(self) -> set[str]:
+        content = self.read_long_term()
+        if self._fact_fingerprints is None:
+            self._fact_fingerprints = {
+                self._fingerprint(line.strip().removeprefix("- "))
+                for line in content.splitlines()
+                if line.strip()
+            }
+        return self._fact_fingerprints
+
+    @staticmethod
+    def _format_context(long_term: str) -> str:
+        return f"## Long-term Memory\n{long_term}" if long_term else ""
+
+    def _memory_file_key(self) -> tuple[int, int, int] | None:
+        """Identity of MEMORY.md on disk, or None if it does not exist.
+
+        Size and inode are included because mtime alone can repeat within one
+        timestamp tick on filesystems with coarse timestamps.
+        """
+        try:
+            st = self.memory_file.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _cache_long_term(self, content: str) -> str:
+        self._lt_cache = (self._memory_file_key(), content, self._format_context(content))
+        return content
 
     def read_long_term(self) -> str:
-        if self.memory_file.exists():
-            return self.memory_file.read_text(encoding="utf-8")
-        return ""
+        key = self._memory_file_key()
+        if self._lt_cache is not None and self._lt_cache[0] == key:
+            return self._lt_cache[1]
+        self._fact_fingerprints = None
+        if key is None:
+            return self._cache_long_term("")
+        return self._cache_long_term(self.memory_file.read_text(encoding="utf-8"))
 
     def write_long_term(self, content: str) -> None:
         self.memory_file.write_text(content, encoding="utf-8")
+        self._cache_long_term(content)
+        self._fact_fingerprints = None
+
+    def _append_long_term(self, text: str) -> None:
+        """Append to MEMORY.md without rewriting it; the cache must be fresh."""
+        with open(self.memory_file, "a", encoding="utf-8") as f:
+            f.write(text)
+        self._cache_long_term((self._lt_cache[1] if self._lt_cache else "") + text)
 
     def append_history(self, entry: str) -> None:
-        with open(self.history_file, "a", encoding="utf-8") as f:
-            f.write(entry.rstrip() + "\n\n")
+        """Buffer a history entry; call flush() to write it out."""
+        if self._hist_fd is None:
+            self._hist_fd = self._open_history()
+            atexit.register(self.close)
+        self._hist_buf += (entry.rstrip() + "\n\n").encode("utf-8")
+        self._history_dirty = True
+        if len(self._hist_buf) >= _HISTORY_WRITE_CHUNK:
+            self._write_history_buffer()
+
+    def _open_history(self) -> int:
+        return os.open(
+            self.history_file,
+            os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0),
+            0o644,
+        )
+
+    def _history_replaced(self) -> bool:
+        """True if HISTORY.md was removed or swapped for a new file since it was opened."""
+        try:
+            path_ino = os.stat(self.history_file).st_ino
+        except FileNotFoundError:
+            return True
+        return os.fstat(self._hist_fd).st_ino != path_ino
+
+    def _write_history_buffer(self) -> None:
+        # Rotation, sed -i or rm leave the open descriptor on an orphaned inode.
+        if self._history_replaced():
+            os.close(self._hist_fd)
+            self._hist_fd = self._open_history()
+        written = 0
+        while written < len(self._hist_buf):
+            written += os.write(self._hist_fd, self._hist_buf[written:])
+        self._hist_buf.clear()
+
+    def flush(self) -> None:
+        """Hand buffered history entries to the OS; fsync is deferred to close()."""
+        if self._hist_fd is not None and self._hist_buf:
+            self._write_history_buffer()
+
+    def close(self) -> None:
+        """Flush, fsync and release the history file descriptor."""
+        if self._hist_fd is None:
+            return
+        self.flush()
+        if self._history_dirty:
+            os.fsync(self._hist_fd)
+            self._history_dirty = False
+        os.close(self._hist_fd)
+        self._hist_fd = None
+        atexit.unregister(self.close)
 
     def get_memory_context(self) -> str:
-        long_term = self.read_long_term()
-        return f"## Long-term Memory\n{long_term}" if long_term else ""
+        self.read_long_term()
+        return self._lt_cache[2] if self._lt_cache else ""
 
     def remember_fact(self, fact: str) -> bool:
         """Persist a single user fact into MEMORY.md and HISTORY.md."""
@@ -74,68 +357,87 @@ class MemoryStore:
         if not cleaned:
             return False
 
-        memory = self.read_long_term().strip()
-        if cleaned.lower() in memory.lower():
+        fingerprint = self._fingerprint(cleaned)
+        fingerprints = self._load_fingerprints()
+        if fingerprint in fingerprints:
             return False
 
-        if not memory:
-            memory = "# Long-term Memory"
-
+        memory = self.read_long_term()
         section_title = "## Relationship Memory"
-        if section_title not in memory:
-            memory = memory.rstrip() + f"\n\n{section_title}\n"
-
-        memory = memory.rstrip() + f"\n- {cleaned}\n"
-        self.write_long_term(memory + "\n")
+        if section_title in memory:
+            body = memory.rstrip()
+            if len(body) == len(memory) - 1 and memory.endswith("\n"):
+                # Facts always go to the end of the file, so a plain append suffices.
+                self._append_long_term(f"- {cleaned}\n")
+            else:
+                # Trailing blank lines (older versions left one) would split the list.
+                self.write_long_term(f"{body}\n- {cleaned}\n")
+        else:
+            memory = memory.strip() or "# Long-term Memory"
+            self.write_long_term(f"{memory}\n\n{section_title}\n- {cleaned}\n")
+        fingerprints.add(fingerprint)
+        self._fact_fingerprints = fingerprints
 
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M")
-        self.append_history(f"[{ts}] Learned user fact: {cleaned}")
+        self.append_history(f"[{_now_minute_stamp()}] Learned user fact: {cleaned}")
         return True
 
     def capture_from_user_message(self, text: str) -> int:
         """Extract obvious personal facts from a user message and persist them."""
         if not text:
             return 0
-
-        rules: list[tuple[re.Pattern[str], str]] = [
-            (re.compile(r"\bmy name is\s+([^.,!\n]{1,60})", re.IGNORECASE), "User's name is {0}."),
-            (
-                re.compile(r"\bi(?: am|'m)\s+from\s+([^.,!\n]{1,80})", re.IGNORECASE),
-                "User is from {0}.",
-            ),
-            (re.compile(r"\bi\s+prefer\s+([^.,!\n]{1,100})", re.IGNORECASE), "User prefers {0}."),
-            (
-                re.compile(r"\bi\s+(?:really\s+)?like\s+([^.,!\n]{1,100})", re.IGNORECASE),
-                "User likes {0}.",
-            ),
-            (
-                re.compile(r"\bi\s+(?:really\s+)?love\s+([^.,!\n]{1,100})", re.IGNORECASE),
-                "User loves {0}.",
-            ),
-            (
-                re.compile(
-                    r"\bmy favorite\s+([^.,!\n]{1,40})\s+is\s+([^.,!\n]{1,80})", re.IGNORECASE
-                ),
-                "User's favorite {0} is {1}.",
-            ),
-            (re.compile(r"\bremember that\s+([^\n]{3,180})", re.IGNORECASE), "{0}"),
-            (re.compile(r"\bdon't forget(?: that)?\s+([^\n]{3,180})", re.IGNORECASE), "{0}"),
-        ]
-
         facts: list[str] = []
-        for pattern, fmt in rules:
-            for match in pattern.finditer(text):
-                groups = [g.strip(" \t\"'`") for g in match.groups() if g]
-                if not groups:
-                    continue
-                facts.append(fmt.format(*groups))
+        # End of each rule's last match: like separate finditer scans, a rule never
+        # overlaps its own earlier match, while different rules may overlap.
+        rule_ends: dict[str, int] = {}
+        low = text.lower()
+        if len(low) == len(text):
+            prefix_match = _match_fact_prefix(low)
+            if prefix_match is None and not _has_fact_keyword(low):
+                return 0
+            pos = 0
+            if prefix_match is not None:
+                # Resume the regex scan at the fact itself so triggers inside it still fire.
+                tag, pos, end = prefix_match
+                rule_ends[tag] = end
+                if fact := text[pos:end].strip(_FACT_STRIP_CHARS):
+                    facts.append(fact)
+            # Offsets in low line up with text, so captures keep the user's casing.
+            matches = _FACT_RE.finditer(low, pos)
+        else:
+            # Lowercasing changed the length (e.g. "İ"), so offsets in low would drift;
+            # match the original text case-insensitively instead.
+            matches = _FACT_RE_NOCASE.finditer(text)
+        for match in matches:
+            tag = match.lastgroup
+            start, end = match.span(tag)
+            if start < rule_ends.get(tag, 0):
+                continue
+            rule_ends[tag] = end
+            groups = [
+                text[start:end].strip(_FACT_STRIP_CHARS)
+                for start, end in map(match.span, _FACT_GROUPS[tag])
+            ]
+            if not all(groups):
+                continue
+            facts.append(_FACT_FORMATS[tag].format(*groups))
 
         saved = 0
         for fact in facts[:5]:
             if self.remember_fact(fact):
                 saved += 1
+        if saved:
+            self.flush()
         return saved
 
+    def _recently_consolidated(self, key: bytes) -> bool:
+        done_at = self._recent_consolidations.get(key)
+        if done_at is None:
+            return False
+        if time.monotonic() - done_at > _CONSOLIDATION_CACHE_TTL:
+            del self._recent_consolidations[key]
+            return False
+        return True
+
     async def consolidate(
         self,
         session: Session,
@@ -167,40 +469,50 @@ class MemoryStore:
                 "Memory consolidation: {} to consolidate, {} keep", len(old_messages), keep_count
             )
 
-        lines = []
+        if not any(m.get("content") for m in old_messages):
+            session.last_consolidated = 0 if archive_all else len(session.messages) - keep_count
+            logger.info("Memory consolidation: no message content to consolidate, skipping")
+            return True
+
+        buf = io.StringIO()
+        write = buf.write
+        role_labels = _ROLE_LABELS
+        sep = ""
         for m in old_messages:
-            if not m.get("content"):
+            content = m.get("content")
+            if not content:
                 continue
-            tools = f" [tools: {', '.join(m['tools_used'])}]" if m.get("tools_used") else ""
-            lines.append(
-                f"[{m.get('timestamp', '?')[:16]}] {m['role'].upper()}{tools}: {m['content']}"
-            )
-
+            role = m["role"]
+            tools_used = m.get("tools_used")
+            tools = " [tools: " + ", ".join(tools_used) + "]" if tools_used else ""
+            label = role_labels.get(role) or role.upper()
+            write(f"{sep}[{m.get('timestamp', '?')[:16]}] {label}{tools}: {content}")
+            sep = "\n"
+
+        conversation = buf.getvalue()
         current_memory = self.read_long_term()
         relationship_mode = "ON" if girlfriend_mode else "OFF"
-        prompt = f"""Process this conversation and call the save_memory tool with your consolidation.
-
-## Current Long-term Memory
-{current_memory or "(empty)"}
-
-## Relationship Companion Mode
-{relationship_mode}
-
-When relationship mode is ON, prioritize retaining user preferences, emotional cues, and personal details
-that help maintain continuity in future conversations.
+        cache_key = (
+            relationship_mode.encode("ascii")
+            + hashlib.blake2b(current_memory.encode("utf-8"), digest_size=16).digest()
+            + hashlib.blake2b(conversation.encode("utf-8"), digest_size=16).digest()
+        )
+        if self._recently_consolidated(cache_key):
+            session.last_consolidated = 0 if archive_all else len(session.messages) - keep_count
+            logger.info(
+                "Memory consolidation: same memory and messages just consolidated, skipping"
+            )
+            return True
 
-## Conversation to Process
-{chr(10).join(lines)}"""
+        prompt = _CONSOLIDATION_PROMPT.format(
+            memory=current_memory or "(empty)",
+            mode=relationship_mode,
+            conversation=conversation,
+        )
 
         try:
             response = await provider.chat(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a memory consolidation agent. Call the save_memory tool with your consolidation of the conversation.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
+                messages=[_CONSOLIDATION_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
                 tools=_SAVE_MEMORY_TOOL,
                 model=model,
             )
@@ -212,7 +524,7 @@ that help maintain continuity in future conversations.
             args = response.tool_calls[0].arguments
             # Some providers return arguments as a JSON string instead of dict
             if isinstance(args, str):
-                args = json.loads(args)
+                args = _json_loads(args)
             if not isinstance(args, dict):
                 logger.warning(
                     "Memory consolidation: unexpected arguments type {}", type(args).__name__
@@ -221,14 +533,20 @@ that help maintain continuity in future conversations.
 
             if entry := args.get("history_entry"):
                 if not isinstance(entry, str):
-                    entry = json.dumps(entry, ensure_ascii=False)
+                    entry = _json_dumps(entry)
                 self.append_history(entry)
+                self.flush()
             if update := args.get("memory_update"):
                 if not isinstance(update, str):
-                    update = json.dumps(update, ensure_ascii=False)
+                    update = _json_dumps(update)
                 if update != current_memory:
                     self.write_long_term(update)
 
+            self._recent_consolidations[cache_key] = time.monotonic()
+            self._recent_consolidations.move_to_end(cache_key)
+            while len(self._recent_consolidations) > _CONSOLIDATION_CACHE_SIZE:
+                self._recent_consolidations.popitem(last=False)
+
             session.last_consolidated = 0 if archive_all else len(session.messages) - keep_count
             logger.info(
                 "Memory consolidation done: {} messages, last_consolidated={}",
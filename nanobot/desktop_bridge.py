@@ -3,14 +3,93 @@
 from __future__ import annotations
 
 import asyncio
-import base64
+import binascii
 import json
 import re
 import sys
-import tempfile
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.config.loader import get_data_dir, load_config
+from nanobot.cron.service import CronService
+from nanobot.providers.custom_provider import CustomProvider
+from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.openai_codex_provider import OpenAICodexProvider
+from nanobot.providers.registry import find_by_name
+from nanobot.providers.transcription import GroqTranscriptionProvider
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import Config
+    from nanobot.providers.base import LLMProvider
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+@lru_cache(maxsize=1)
+def _load_config() -> Config:
+    return load_config()
+
+
+def _make_provider(config: Config) -> LLMProvider:
+    model = config.agents.defaults.model
+    provider_name = config.get_provider_name(model)
+    provider_cfg = config.get_provider(model)
+
+    if provider_name == "openai_codex" or model.startswith("openai-codex/"):
+        return OpenAICodexProvider(default_model=model)
+    if provider_name == "custom":
+        return CustomProvider(
+            api_key=provider_cfg.api_key if provider_cfg else "no-key",
+            api_base=config.get_api_base(model) or "http://localhost:8000/v1",
+            default_model=model,
+        )
+
+    spec = find_by_name(provider_name)
+    if (
+        not model.startswith("bedrock/")
+        and not (provider_cfg and provider_cfg.api_key)
+        and not (spec and spec.is_oauth)
+    ):
+        raise RuntimeError(
+            "No API key configured. Set one in ~/.nanobot/config.json under providers section."
+        )
+    return LiteLLMProvider(
+        api_key=provider_cfg.api_key if provider_cfg else None,
+        api_base=config.get_api_base(model),
+        default_model=model,
+        extra_headers=provider_cfg.extra_headers if provider_cfg else None,
+        provider_name=provider_name,
+    )
+
+
+_PROACTIVE_TEMPLATE = (
+    "You are proactively checking in with the user in desktop overlay mode. "
+    "Create exactly one short, natural, non-annoying girlfriend-style message (1-2 short sentences, under 45 words). "
+    "If screenshots are attached, ground your message in visible context and suggest one small next step. "
+    "Do not sound robotic, do not guilt-trip, and do not send generic spammy motivation. "
+    "Do not use bullet points or numbered lists. "
+    "Do not mention screenshots unless it helps the suggestion feel natural. "
+    "If there is no meaningful, useful nudge right now, reply exactly with __SKIP__. "
+    "The user has been idle for about {idle} minutes. "
+    "Local time: {local_time}."
+)
+
+
+def _sanitize_media(raw: Any) -> list[str]:
+    """Keep only the string entries of a request's media list."""
+    if not raw or not isinstance(raw, list):
+        return []
+    return [item for item in raw if isinstance(item, str)]
 
 
 @dataclass
@@ -25,46 +104,9 @@ class DesktopBridge:
         self.agent_loop = None
 
     async def start(self) -> None:
-        from nanobot.agent.loop import AgentLoop
-        from nanobot.bus.queue import MessageBus
-        from nanobot.config.loader import get_data_dir, load_config
-        from nanobot.cron.service import CronService
-        from nanobot.providers.registry import find_by_name
-        from nanobot.providers.custom_provider import CustomProvider
-        from nanobot.providers.litellm_provider import LiteLLMProvider
-        from nanobot.providers.openai_codex_provider import OpenAICodexProvider
-
-        config = load_config()
+        config = _load_config()
         bus = MessageBus()
-        model = config.agents.defaults.model
-        provider_name = config.get_provider_name(model)
-        provider_cfg = config.get_provider(model)
-
-        if provider_name == "openai_codex" or model.startswith("openai-codex/"):
-            provider = OpenAICodexProvider(default_model=model)
-        elif provider_name == "custom":
-            provider = CustomProvider(
-                api_key=provider_cfg.api_key if provider_cfg else "no-key",
-                api_base=config.get_api_base(model) or "http://localhost:8000/v1",
-                default_model=model,
-            )
-        else:
-            spec = find_by_name(provider_name)
-            if (
-                not model.startswith("bedrock/")
-                and not (provider_cfg and provider_cfg.api_key)
-                and not (spec and spec.is_oauth)
-            ):
-                raise RuntimeError(
-                    "No API key configured. Set one in ~/.nanobot/config.json under providers section."
-                )
-            provider = LiteLLMProvider(
-                api_key=provider_cfg.api_key if provider_cfg else None,
-                api_base=config.get_api_base(model),
-                default_model=model,
-                extra_headers=provider_cfg.extra_headers if provider_cfg else None,
-                provider_name=provider_name,
-            )
+        provider = _make_provider(config)
 
         cron_store_path = get_data_dir() / "cron" / "jobs.json"
         cron = CronService(cron_store_path)
@@ -115,12 +157,7 @@ class DesktopBridge:
                 return {"text": ""}
 
             session = str(request.payload.get("session", "overlay:default"))
-            raw_media = request.payload.get("media") or []
-            media = (
-                [str(item) for item in raw_media if isinstance(item, str)]
-                if isinstance(raw_media, list)
-                else []
-            )
+            media = _sanitize_media(request.payload.get("media"))
             response = await self.agent_loop.process_direct(text, session, media=media)
             return {"text": response or ""}
 
@@ -131,23 +168,10 @@ class DesktopBridge:
             session = str(request.payload.get("session", "overlay:default"))
             idle_minutes = int(request.payload.get("idle_minutes") or 0)
             local_time = str(request.payload.get("local_time") or "")
-            raw_media = request.payload.get("media") or []
-            media = (
-                [str(item) for item in raw_media if isinstance(item, str)]
-                if isinstance(raw_media, list)
-                else []
-            )
+            media = _sanitize_media(request.payload.get("media"))
 
-            proactive_prompt = (
-                "You are proactively checking in with the user in desktop overlay mode. "
-                "Create exactly one short, natural, non-annoying girlfriend-style message (1-2 short sentences, under 45 words). "
-                "If screenshots are attached, ground your message in visible context and suggest one small next step. "
-                "Do not sound robotic, do not guilt-trip, and do not send generic spammy motivation. "
-                "Do not use bullet points or numbered lists. "
-                "Do not mention screenshots unless it helps the suggestion feel natural. "
-                "If there is no meaningful, useful nudge right now, reply exactly with __SKIP__. "
-                f"The user has been idle for about {idle_minutes} minutes. "
-                f"Local time: {local_time or 'unknown'}."
+            proactive_prompt = _PROACTIVE_TEMPLATE.format(
+                idle=idle_minutes, local_time=local_time or "unknown"
             )
 
             response = await self.agent_loop.process_direct(proactive_prompt, session, media=media)
@@ -173,39 +197,36 @@ class DesktopBridge:
             suffix = ext_map.get(mime_type, ".webm")
 
             try:
-                audio_bytes = base64.b64decode(audio_base64, validate=True)
+                # Multi-MB clips would stall the loop; strict mode matches b64decode(validate=True).
+                audio_bytes = await asyncio.to_thread(
+                    binascii.a2b_base64, audio_base64, strict_mode=True
+                )
             except Exception:
                 return {"text": "", "error": "Invalid audio encoding"}
 
             if not audio_bytes:
                 return {"text": "", "error": "Empty audio payload"}
 
-            from nanobot.providers.transcription import GroqTranscriptionProvider
-
-            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-                tmp.write(audio_bytes)
-                tmp_path = Path(tmp.name)
-
-            try:
-                transcriber = GroqTranscriptionProvider()
-                text = (await transcriber.transcribe(tmp_path)).strip()
-                if not text:
-                    return {
-                        "text": "",
-                        "error": "Transcription unavailable. Set GROQ_API_KEY and try again.",
-                    }
-                return {"text": text}
-            finally:
-                try:
-                    tmp_path.unlink(missing_ok=True)
-                except Exception:
-                    pass
+            transcriber = GroqTranscriptionProvider()
+            text = (
+                await transcriber.transcribe_bytes(
+                    audio_bytes,
+                    filename=f"audio{suffix}",
+                    content_type=mime_type if mime_type in ext_map else None,
+                )
+            ).strip()
+            if not text:
+                return {
+                    "text": "",
+                    "error": "Transcription unavailable. Set GROQ_API_KEY and try again.",
+                }
+            return {"text": text}
 
         raise ValueError(f"Unsupported request type: {request.req_type}")
 
 
-def _parse_request(line: str) -> BridgeRequest:
-    data = json.loads(line)
+def _parse_request(line: str | bytes) -> BridgeRequest:
+    data = _json_loads(line)
     request_id = str(data.get("id", ""))
     req_type = str(data.get("type", ""))
     payload = data.get("payload") or {}
@@ -216,23 +237,154 @@ def _parse_request(line: str) -> BridgeRequest:
     return BridgeRequest(request_id=request_id, req_type=req_type, payload=payload)
 
 
-def _emit(data: dict[str, Any]) -> None:
-    sys.stdout.write(json.dumps(data, ensure_ascii=True) + "\n")
-    sys.stdout.flush()
+class _ThreadedStdinReader:
+    """Fallback for stdin that cannot be attached to the event loop (e.g. a regular file)."""
+
+    async def readline(self) -> bytes:
+        return await asyncio.to_thread(sys.stdin.buffer.readline)
+
 
+class _BlockingStdoutWriter:
+    """Fallback for stdout that cannot be attached to the event loop."""
 
-async def _readline() -> str:
-    return await asyncio.to_thread(sys.stdin.readline)
+    def write(self, data: bytes) -> None:
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+    async def drain(self) -> None:
+        pass
+
+
+def _encode(data: dict[str, Any]) -> bytes:
+    # The overlay decodes stdout chunk by chunk, so output must stay pure ASCII.
+    if ORJSON_AVAILABLE:
+        try:
+            body = orjson.dumps(data)
+        except TypeError:
+            pass
+        else:
+            if body.isascii():
+                return body + b"\n"
+    return (json.dumps(data, ensure_ascii=True) + "\n").encode("ascii")
+
+
+class _Emitter:
+    """Coalesces responses emitted in the same event-loop turn into one write."""
+
+    def __init__(self, writer: asyncio.StreamWriter | _BlockingStdoutWriter) -> None:
+        self._writer = writer
+        self._pending = bytearray()
+        self._scheduled = False
+        self.closed = False
+
+    def emit(self, data: dict[str, Any]) -> None:
+        if self.closed:
+            return
+        self._pending += _encode(data)
+        if not self._scheduled:
+            self._scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self) -> None:
+        self._scheduled = False
+        if self._pending and not self.closed:
+            try:
+                self._writer.write(bytes(self._pending))
+            except ConnectionError:
+                self.closed = True
+        self._pending.clear()
+
+    async def drain(self) -> None:
+        """Wait only if the consumer is not keeping up with output."""
+        if self.closed:
+            return
+        try:
+            await self._writer.drain()
+        except ConnectionError:
+            # The overlay closed its end of stdout; nothing more can be delivered.
+            self.closed = True
+
+
+# Transcribe requests carry base64 audio on a single line.
+_STDIN_LINE_LIMIT = 64 * 1024 * 1024
+
+
+async def _open_stdio() -> tuple[
+    asyncio.StreamReader | _ThreadedStdinReader, asyncio.StreamWriter | _BlockingStdoutWriter
+]:
+    loop = asyncio.get_running_loop()
+
+    reader: asyncio.StreamReader | _ThreadedStdinReader
+    try:
+        stream_reader = asyncio.StreamReader(limit=_STDIN_LINE_LIMIT)
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(stream_reader), sys.stdin.buffer
+        )
+        reader = stream_reader
+    except (NotImplementedError, OSError, ValueError):
+        reader = _ThreadedStdinReader()
+
+    writer: asyncio.StreamWriter | _BlockingStdoutWriter
+    try:
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, sys.stdout.buffer
+        )
+        writer = asyncio.StreamWriter(transport, protocol, None, loop)
+        # The pipe transport puts fd 1 in O_NONBLOCK mode, where a stray print() from a
+        # dependency could raise BlockingIOError and would corrupt the protocol anyway.
+        # Responses go through the transport, so route everything else to stderr.
+        sys.stdout = sys.stderr
+    except (NotImplementedError, OSError, ValueError):
+        writer = _BlockingStdoutWriter()
+
+    return reader, writer
+
+
+async def _read_line(reader: asyncio.StreamReader | _ThreadedStdinReader) -> bytes | None:
+    """Read one request line; b"" at EOF, None if it exceeded the limit and was discarded."""
+    if isinstance(reader, _ThreadedStdinReader):
+        return await reader.readline()
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as exc:
+        return exc.partial
+    except asyncio.LimitOverrunError as exc:
+        consumed = exc.consumed
+
+    # Drop the buffered part of the oversized line, then keep looking for its end.
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as exc:
+            consumed = exc.consumed
 
 
 async def main() -> None:
+    reader, writer = await _open_stdio()
+    emitter = _Emitter(writer)
     bridge = DesktopBridge()
     await bridge.start()
-    _emit({"type": "ready"})
+    emitter.emit({"type": "ready"})
 
     try:
         while True:
-            line = await _readline()
+            line = await _read_line(reader)
+            if line is None:
+                emitter.emit(
+                    {
+                        "id": "",
+                        "ok": False,
+                        "error": f"Request exceeds {_STDIN_LINE_LIMIT // (1024 * 1024)} MiB limit",
+                    }
+                )
+                await emitter.drain()
+                if emitter.closed:
+                    break
+                continue
             if not line:
                 break
 
@@ -243,22 +395,29 @@ async def main() -> None:
             try:
                 request = _parse_request(raw)
                 payload = await bridge.handle(request)
-                _emit({"id": request.request_id, "ok": True, "payload": payload})
+                emitter.emit({"id": request.request_id, "ok": True, "payload": payload})
             except Exception as exc:
                 request_id = ""
                 try:
-                    request_id = str(json.loads(raw).get("id", ""))
+                    request_id = str(_json_loads(raw).get("id", ""))
                 except Exception:
                     pass
-                _emit(
+                emitter.emit(
                     {
                         "id": request_id,
                         "ok": False,
                         "error": str(exc),
                     }
                 )
+            await emitter.drain()
+            if emitter.closed:
+                break
     finally:
-        await bridge.stop()
+        try:
+            emitter.flush()
+            await emitter.drain()
+        finally:
+            await bridge.stop()
 
 
 if __name__ == "__main__":
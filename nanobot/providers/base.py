@@ -92,6 +92,9 @@ class LLMProvider(ABC):
         """
         Send a chat completion request.
         
+        Callers may pass shared module-level messages and tool definitions, so
+        implementations must copy them before making changes.
+        
         Args:
             messages: List of message dicts with 'role' and 'content'.
             tools: Optional list of tool definitions.
@@ -38,27 +38,56 @@ class GroqTranscriptionProvider:
             logger.error("Audio file not found: {}", file_path)
             return ""
         
+        try:
+            with open(path, "rb") as f:
+                return await self._post((path.name, f))
+        except OSError as e:
+            logger.error("Groq transcription error: {}", e)
+            return ""
+    
+    async def transcribe_bytes(
+        self, audio: bytes, filename: str = "audio.webm", content_type: str | None = None
+    ) -> str:
+        """
+        Transcribe in-memory audio using Groq, without writing a temp file.
+        
+        Args:
+            audio: Raw audio bytes.
+            filename: Upload filename; Groq infers the format from its extension.
+            content_type: Optional MIME type of the audio.
+            
+        Returns:
+            Transcribed text.
+        """
+        if not self.api_key:
+            logger.warning("Groq API key not configured for transcription")
+            return ""
+        
+        if content_type:
+            return await self._post((filename, audio, content_type))
+        return await self._post((filename, audio))
+    
+    async def _post(self, file: tuple[Any, ...]) -> str:
         try:
             async with httpx.AsyncClient() as client:
-                with open(path, "rb") as f:
-                    files = {
-                        "file": (path.name, f),
-                        "model": (None, "whisper-large-v3"),
-                    }
-                    headers = {
-                        "Authorization": f"Bearer {self.api_key}",
-                    }
-                    
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=60.0
-                    )
-                    
-                    response.raise_for_status()
-                    data = response.json()
-                    return data.get("text", "")
+                files = {
+                    "file": file,
+                    "model": (None, "whisper-large-v3"),
+                }
+                headers = {
+                    "Authorization": f"Bearer {self.api_key}",
+                }
+                
+                response = await client.post(
+                    self.api_url,
+                    headers=headers,
+                    files=files,
+                    timeout=60.0
+                )
+                
+                response.raise_for_status()
+                data = response.json()
+                return data.get("text", "")
                     
         except Exception as e:
             logger.error("Groq transcription error: {}", e)
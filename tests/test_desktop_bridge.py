@@ -0,0 +1,154 @@
+"""Tests for the desktop overlay JSON-over-stdio bridge helpers."""
+
+import asyncio
+import json
+
+import pytest
+
+from nanobot.desktop_bridge import (
+    _Emitter,
+    _encode,
+    _parse_request,
+    _read_line,
+    _sanitize_media,
+)
+
+
+class TestParseRequest:
+    def test_parses_bytes_line(self) -> None:
+        request = _parse_request(b'{"id": "1", "type": "message", "payload": {"text": "hi"}}')
+
+        assert request.request_id == "1"
+        assert request.req_type == "message"
+        assert request.payload == {"text": "hi"}
+
+    def test_non_dict_payload_becomes_empty(self) -> None:
+        request = _parse_request('{"id": "1", "type": "health", "payload": [1, 2]}')
+
+        assert request.payload == {}
+
+    def test_missing_type_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            _parse_request('{"id": "1"}')
+
+
+class TestEncode:
+    def test_output_is_ascii_json_line(self) -> None:
+        line = _encode({"id": "1", "payload": {"text": "héllo 💕"}})
+
+        assert line.endswith(b"\n")
+        assert line.isascii()
+        assert b"\\u00e9" in line
+
+
+class TestSanitizeMedia:
+    def test_keeps_only_strings(self) -> None:
+        assert _sanitize_media(["/tmp/a.png", 3, None, "/tmp/b.png"]) == [
+            "/tmp/a.png",
+            "/tmp/b.png",
+        ]
+
+    @pytest.mark.parametrize("raw", [None, [], "not-a-list", {"a": 1}])
+    def test_non_list_or_empty_yields_empty(self, raw) -> None:
+        assert _sanitize_media(raw) == []
+
+
+class _RecordingWriter:
+    def __init__(self) -> None:
+        self.writes: list[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.writes.append(data)
+
+    async def drain(self) -> None:
+        pass
+
+
+class TestEmitter:
+    @pytest.mark.asyncio
+    async def test_same_turn_responses_share_one_write(self) -> None:
+        writer = _RecordingWriter()
+        emitter = _Emitter(writer)
+
+        emitter.emit({"id": "1", "ok": True})
+        emitter.emit({"id": "2", "ok": True})
+        assert writer.writes == []
+
+        await asyncio.sleep(0)
+        assert len(writer.writes) == 1
+        assert [json.loads(line) for line in writer.writes[0].splitlines()] == [
+            {"id": "1", "ok": True},
+            {"id": "2", "ok": True},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_pending_immediately(self) -> None:
+        writer = _RecordingWriter()
+        emitter = _Emitter(writer)
+
+        emitter.emit({"type": "ready"})
+        emitter.flush()
+
+        assert len(writer.writes) == 1
+        await asyncio.sleep(0)
+        assert len(writer.writes) == 1
+
+    @pytest.mark.asyncio
+    async def test_lost_connection_marks_emitter_closed(self) -> None:
+        class _ClosedWriter(_RecordingWriter):
+            async def drain(self) -> None:
+                raise ConnectionResetError("Connection lost")
+
+        writer = _ClosedWriter()
+        emitter = _Emitter(writer)
+
+        emitter.emit({"id": "1", "ok": True})
+        emitter.flush()
+        await emitter.drain()
+        assert emitter.closed
+
+        emitter.emit({"id": "2", "ok": True})
+        emitter.flush()
+        await emitter.drain()
+        assert len(writer.writes) == 1
+
+
+class TestReadLine:
+    @staticmethod
+    def _reader(data: bytes, limit: int = 16) -> asyncio.StreamReader:
+        reader = asyncio.StreamReader(limit=limit)
+        reader.feed_data(data)
+        reader.feed_eof()
+        return reader
+
+    @pytest.mark.asyncio
+    async def test_oversized_line_is_skipped(self) -> None:
+        reader = self._reader(b'{"id": "1"}\n' + b"x" * 100 + b"\n" + b'{"id": "2"}\n')
+
+        assert await _read_line(reader) == b'{"id": "1"}\n'
+        assert await _read_line(reader) is None
+        assert await _read_line(reader) == b'{"id": "2"}\n'
+        assert await _read_line(reader) == b""
+
+    @pytest.mark.asyncio
+    async def test_oversized_line_arriving_in_chunks(self) -> None:
+        reader = asyncio.StreamReader(limit=16)
+
+        async def feed() -> None:
+            for _ in range(10):
+                reader.feed_data(b"y" * 10)
+                await asyncio.sleep(0)
+            reader.feed_data(b'\n{"id": "3"}\n')
+            reader.feed_eof()
+
+        task = asyncio.create_task(feed())
+        assert await _read_line(reader) is None
+        assert await _read_line(reader) == b'{"id": "3"}\n'
+        await task
+
+    @pytest.mark.asyncio
+    async def test_unterminated_oversized_line_at_eof(self) -> None:
+        reader = self._reader(b"z" * 100)
+
+        assert await _read_line(reader) is None
+        assert await _read_line(reader) == b""
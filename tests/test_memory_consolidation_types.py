@@ -60,6 +60,7 @@ class TestMemoryConsolidationTypeHandling:
         session = _make_session(message_count=60)
 
         result = await store.consolidate(session, provider, "test-model", memory_window=50)
+        store.close()
 
         assert result is True
         assert store.history_file.exists()
@@ -80,6 +81,7 @@ class TestMemoryConsolidationTypeHandling:
         session = _make_session(message_count=60)
 
         result = await store.consolidate(session, provider, "test-model", memory_window=50)
+        store.close()
 
         assert result is True
         assert store.history_file.exists()
@@ -115,6 +117,7 @@ class TestMemoryConsolidationTypeHandling:
         session = _make_session(message_count=60)
 
         result = await store.consolidate(session, provider, "test-model", memory_window=50)
+        store.close()
 
         assert result is True
         assert "User discussed testing." in store.history_file.read_text()
@@ -145,3 +148,76 @@ class TestMemoryConsolidationTypeHandling:
 
         assert result is True
         provider.chat.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_repeated_identical_consolidation_skips_llm(self, tmp_path: Path) -> None:
+        """Re-running consolidation on unchanged memory and messages reuses the last result."""
+        store = MemoryStore(tmp_path)
+        provider = AsyncMock()
+        provider.chat = AsyncMock(
+            return_value=_make_tool_response(
+                history_entry="[2026-01-01] User discussed testing.", memory_update=""
+            )
+        )
+        session = _make_session(message_count=60)
+
+        assert await store.consolidate(session, provider, "test-model", archive_all=True)
+        assert await store.consolidate(session, provider, "test-model", archive_all=True)
+        store.close()
+
+        assert provider.chat.await_count == 1
+        assert session.last_consolidated == 0
+
+    @pytest.mark.asyncio
+    async def test_skips_llm_when_messages_have_no_content(self, tmp_path: Path) -> None:
+        """Empty or tool-only messages advance the offset without an LLM call."""
+        store = MemoryStore(tmp_path)
+        provider = AsyncMock()
+        session = _make_session(message_count=60)
+        for message in session.messages:
+            message["content"] = ""
+
+        result = await store.consolidate(session, provider, "test-model", memory_window=50)
+
+        assert result is True
+        provider.chat.assert_not_called()
+        assert session.last_consolidated == 35
+
+    @pytest.mark.asyncio
+    async def test_orjson_parses_and_serializes_arguments(self, tmp_path: Path) -> None:
+        """With orjson installed, string arguments and non-string values go through it."""
+        orjson = pytest.importorskip("orjson")
+        import nanobot.agent.memory as memory_module
+
+        assert memory_module.ORJSON_AVAILABLE
+        assert memory_module._json_loads is orjson.loads
+
+        store = MemoryStore(tmp_path)
+        provider = AsyncMock()
+        response = LLMResponse(
+            content=None,
+            tool_calls=[
+                ToolCallRequest(
+                    id="call_1",
+                    name="save_memory",
+                    arguments=orjson.dumps(
+                        {
+                            "history_entry": {"summary": "Usuário discutiu testes."},
+                            "memory_update": {"facts": ["User likes testing"]},
+                        }
+                    ).decode(),
+                )
+            ],
+        )
+        provider.chat = AsyncMock(return_value=response)
+        session = _make_session(message_count=60)
+
+        result = await store.consolidate(session, provider, "test-model", memory_window=50)
+        store.close()
+
+        assert result is True
+        # orjson output is compact and keeps non-ASCII text as-is.
+        assert store.history_file.read_text(encoding="utf-8") == (
+            '{"summary":"Usuário discutiu testes."}\n\n'
+        )
+        assert store.memory_file.read_text() == '{"facts":["User likes testing"]}'
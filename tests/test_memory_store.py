@@ -0,0 +1,223 @@
+"""Tests for MemoryStore fact capture and long-term memory caching."""
+
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.memory import MemoryStore
+
+
+@pytest.fixture
+def store(tmp_path: Path):
+    """A MemoryStore whose history descriptor is closed after the test."""
+    memory_store = MemoryStore(tmp_path)
+    yield memory_store
+    memory_store.close()
+
+
+class TestRememberFact:
+    def test_remember_fact_appends_bullet(self, store: MemoryStore) -> None:
+        assert store.remember_fact("User likes tea.") is True
+        assert store.remember_fact("User likes rain.") is True
+        store.flush()
+
+        content = store.memory_file.read_text()
+        assert content == (
+            "# Long-term Memory\n\n## Relationship Memory\n- User likes tea.\n- User likes rain.\n"
+        )
+        assert "Learned user fact: User likes tea." in store.history_file.read_text()
+
+    def test_appends_to_file_with_trailing_blank_line(self, store: MemoryStore) -> None:
+        store.memory_file.write_text(
+            "# Long-term Memory\n\n## Relationship Memory\n- User likes tea.\n\n"
+        )
+
+        assert store.remember_fact("User likes rain.") is True
+        assert store.remember_fact("User likes snow.") is True
+        assert store.memory_file.read_text() == (
+            "# Long-term Memory\n\n## Relationship Memory\n"
+            "- User likes tea.\n- User likes rain.\n- User likes snow.\n"
+        )
+
+    def test_history_is_buffered_until_flush(self, store: MemoryStore) -> None:
+        store.append_history("[2026-01-01 00:00] Something happened.")
+        assert store.history_file.read_text() == ""
+
+        store.flush()
+        assert store.history_file.read_text() == "[2026-01-01 00:00] Something happened.\n\n"
+
+    def test_fsync_only_on_close(self, store: MemoryStore, monkeypatch) -> None:
+        import nanobot.agent.memory as memory_module
+
+        fsyncs: list[int] = []
+        monkeypatch.setattr(memory_module.os, "fsync", fsyncs.append)
+
+        assert store.capture_from_user_message("My name is Ada") == 1
+        assert store.capture_from_user_message("I'm from Oslo") == 1
+        assert "User is from Oslo." in store.history_file.read_text()
+        assert fsyncs == []
+
+        store.close()
+        assert len(fsyncs) == 1
+
+    def test_history_written_once_buffer_fills(self, store: MemoryStore) -> None:
+        entry = "x" * 1000
+
+        for _ in range(5):
+            store.append_history(entry)
+
+        assert store.history_file.read_text() == (entry + "\n\n") * 5
+
+    def test_history_follows_replaced_file(self, store: MemoryStore) -> None:
+        store.append_history("one")
+        store.flush()
+
+        replacement = store.history_file.with_suffix(".tmp")
+        replacement.write_text("rewritten\n\n")
+        replacement.replace(store.history_file)
+        store.append_history("two")
+        store.flush()
+        assert store.history_file.read_text() == "rewritten\n\ntwo\n\n"
+
+        store.history_file.unlink()
+        store.append_history("three")
+        store.flush()
+        assert store.history_file.read_text() == "three\n\n"
+
+    def test_remember_fact_skips_known_fact(self, store: MemoryStore) -> None:
+        assert store.remember_fact("User likes tea.") is True
+        assert store.remember_fact("user   likes TEA.") is False
+        assert store.memory_file.read_text().count("User likes tea.") == 1
+
+    def test_known_fact_from_existing_file(self, store: MemoryStore) -> None:
+        store.memory_file.write_text("# Long-term Memory\n\n- User is from Oslo.\n")
+
+        assert store.remember_fact("User is from Oslo.") is False
+        assert store.remember_fact("User prefers mornings.") is True
+
+
+class TestLongTermCache:
+    def test_read_long_term_picks_up_external_writes(self, store: MemoryStore) -> None:
+        assert store.read_long_term() == ""
+
+        store.memory_file.write_text("first")
+        assert store.read_long_term() == "first"
+
+        store.memory_file.write_text("second version")
+        assert store.read_long_term() == "second version"
+
+    def test_external_rewrite_resets_known_facts(self, store: MemoryStore) -> None:
+        assert store.remember_fact("User likes tea.") is True
+
+        store.memory_file.write_text("# Long-term Memory\n")
+        assert store.remember_fact("User likes tea.") is True
+
+    def test_same_mtime_rewrite_is_detected(self, store: MemoryStore) -> None:
+        import os
+
+        store.memory_file.write_text("short")
+        mtime = store.memory_file.stat().st_mtime_ns
+        assert store.read_long_term() == "short"
+
+        store.memory_file.write_text("a longer rewrite")
+        os.utime(store.memory_file, ns=(mtime, mtime))
+        assert store.read_long_term() == "a longer rewrite"
+
+    def test_memory_context_tracks_file_changes(self, store: MemoryStore) -> None:
+        assert store.get_memory_context() == ""
+
+        store.write_long_term("- fact one\n")
+        assert store.get_memory_context() == "## Long-term Memory\n- fact one\n"
+
+        store.memory_file.write_text("- edited elsewhere, longer\n")
+        assert store.get_memory_context() == "## Long-term Memory\n- edited elsewhere, longer\n"
+
+        store.memory_file.unlink()
+        assert store.get_memory_context() == ""
+
+
+class TestCaptureFromUserMessage:
+    def test_captures_facts_in_message_order(self, store: MemoryStore) -> None:
+        saved = store.capture_from_user_message(
+            "My name is Ada. I'm from Lisbon, and my favorite color is green!"
+        )
+
+        assert saved == 3
+        content = store.memory_file.read_text()
+        assert "- User's name is Ada." in content
+        assert "- User is from Lisbon." in content
+        assert "- User's favorite color is green." in content
+
+    def test_ignores_message_without_facts(self, store: MemoryStore) -> None:
+        assert store.capture_from_user_message("What's the weather like today?") == 0
+        assert not store.memory_file.exists()
+
+    def test_caps_facts_per_message(self, store: MemoryStore) -> None:
+        text = ". ".join(f"I like thing{i}" for i in range(8))
+
+        assert store.capture_from_user_message(text) == 5
+
+    def test_prescreen_fallback_without_ahocorasick(self, store: MemoryStore, monkeypatch) -> None:
+        import nanobot.agent.memory as memory_module
+
+        monkeypatch.setattr(memory_module, "_PREMATCHER", None)
+
+        assert store.capture_from_user_message("Nothing personal here.") == 0
+        assert store.capture_from_user_message("I really love hiking") == 1
+
+    def test_keeps_original_casing(self, store: MemoryStore) -> None:
+        assert store.capture_from_user_message("MY NAME IS Ada Lovelace") == 1
+        assert "- User's name is Ada Lovelace." in store.memory_file.read_text()
+
+    def test_keeps_casing_when_lowercase_changes_length(self, store: MemoryStore) -> None:
+        assert store.capture_from_user_message("I'm from İstanbul. Remember that I like Çay") == 3
+
+        content = store.memory_file.read_text()
+        assert "- User is from İstanbul." in content
+        assert "- I like Çay" in content
+        assert "- User likes Çay." in content
+
+    def test_leading_remember_that_saved_verbatim(self, store: MemoryStore) -> None:
+        assert store.capture_from_user_message("Remember that I take my coffee black") == 1
+        assert store.capture_from_user_message("please don't forget my dentist is on Friday") == 1
+
+        content = store.memory_file.read_text()
+        assert "- I take my coffee black" in content
+        assert "- my dentist is on Friday" in content
+
+    def test_leading_trigger_keeps_facts_inside_it(self, store: MemoryStore) -> None:
+        assert store.capture_from_user_message("Don't forget that my favorite tea is oolong") == 2
+
+        content = store.memory_file.read_text()
+        assert "- my favorite tea is oolong" in content
+        assert "- User's favorite tea is oolong." in content
+
+    @pytest.mark.parametrize(
+        ("message", "expected"),
+        [
+            (
+                "My name is Ada and I'm from Oslo",
+                ["User's name is Ada and I'm from Oslo.", "User is from Oslo."],
+            ),
+            ("Remember that my name is Bob", ["my name is Bob", "User's name is Bob."]),
+            (
+                "I like cats and I love dogs",
+                ["User likes cats and I love dogs.", "User loves dogs."],
+            ),
+            ("Don't forget that I like jazz", ["I like jazz", "User likes jazz."]),
+            ("I like tea and I like coffee", ["User likes tea and I like coffee."]),
+            (
+                "My favorite food is sushi and my favorite drink is tea",
+                ["User's favorite food is sushi and my favorite drink is tea."],
+            ),
+            ("i like i like i like cheese", ["User likes i like i like cheese."]),
+            ("Don't forget that    x ", ["x"]),
+        ],
+    )
+    def test_overlapping_rules_all_fire(self, store: MemoryStore, message: str, expected) -> None:
+        assert store.capture_from_user_message(message) == len(expected)
+
+        lines = store.memory_file.read_text().splitlines()
+        assert [line for line in lines if line.startswith("- ")] == [
+            f"- {fact}" for fact in expected
+        ]